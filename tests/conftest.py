@@ -0,0 +1,84 @@
+"""Shared test fixtures, including an in-memory stand-in for Anki Connect"""
+
+import orjson
+import pytest
+import requests
+
+DUPLICATE_ERROR = 'cannot create note because it is a duplicate'
+
+
+class FakeResponse:
+    """The parts of requests.Response that AnkiClient.post() reads"""
+
+    def __init__(self, body):
+        self.content = orjson.dumps(body)
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeAnki:
+    """Answers Anki Connect requests for a single deck and note type, keeping notes in memory"""
+
+    def __init__(self):
+        self.decks = ['日本語']
+        self.model_fields = ['Expression', 'Reading', 'Meaning', 'Sentence', 'Sentence translation']
+        self.notes = {}  # note ID: word
+        self.next_note_id = 100
+        self.actions = []  # Action of every request received, in order
+        self.added = []  # Word of every note sent to addNote, in order
+        self.sent_notes = []  # Every note sent to addNote, in order
+        self.batch_sizes = []  # Number of notes in each multi request
+        self.multi_error = None  # Error returned for whole multi requests, if set
+
+    def post(self, url, data=None, **kwargs):
+        payload = orjson.loads(data)
+        self.actions.append(payload['action'])
+        if payload['action'] == 'multi' and self.multi_error is not None:
+            return FakeResponse({"result": None, "error": self.multi_error})
+        return FakeResponse({"result": self.answer(payload), "error": None})
+
+    def answer(self, payload):
+        action = payload['action']
+        if action == 'modelFieldNames':
+            return self.model_fields
+        if action == 'deckNames':
+            return self.decks
+        if action == 'findNotes':
+            return list(self.notes)
+        if action == 'multi':
+            self.batch_sizes.append(len(payload['params']['actions']))
+            return [self.add_note(item['params']['note']) for item in payload['params']['actions']]
+        raise AssertionError(f"Unexpected Anki Connect action: {action}")
+
+    def add_note(self, note):
+        word = note['fields']['Expression']
+        self.added.append(word)
+        self.sent_notes.append(note)
+        if word in self.notes.values():
+            return {"result": None, "error": DUPLICATE_ERROR}
+        note_id = self.next_note_id
+        self.next_note_id += 1
+        self.notes[note_id] = word
+        return {"result": note_id, "error": None}
+
+
+@pytest.fixture
+def anki(tmp_path, monkeypatch):
+    """Send every AnkiClient request to a FakeAnki, with the known words file in a temporary directory"""
+    settings = {
+        'AUTO_ANKI_DECK_NAME': '日本語',
+        'AUTO_ANKI_CARD_TYPE': 'auto-anki',
+        'AUTO_ANKI_WORD_FIELD': 'Expression',
+        'AUTO_ANKI_READING_FIELD': 'Reading',
+        'AUTO_ANKI_MEANING_FIELD': 'Meaning',
+        'AUTO_ANKI_SENTENCE_FIELD': 'Sentence',
+        'AUTO_ANKI_SENTENCE_TRANSLATION_FIELD': 'Sentence translation',
+        'AUTO_ANKI_KNOWN_WORDS_PATH': str(tmp_path / 'known_words.json'),
+    }
+    for name, value in settings.items():
+        monkeypatch.setenv(name, value)
+
+    fake = FakeAnki()
+    monkeypatch.setattr(requests.Session, 'post', lambda session, url, **kwargs: fake.post(url, **kwargs))
+    return fake
@@ -0,0 +1,52 @@
+"""Tests for the note fields AnkiClient sends to Anki"""
+
+from yasashii.anki_client import AnkiClient
+
+
+def sent_fields(anki, card_info):
+    with AnkiClient() as client:
+        client.create_cards([card_info])
+    return anki.sent_notes[-1]['fields']
+
+
+def test_meaning_field_joins_the_first_three_meanings(anki):
+    """Only the first three lines of the numbered meanings list reach the card"""
+    fields = sent_fields(anki, {
+        'word': '猫',
+        'meanings': '1. (noun) cat\n2. (noun) shamisen\n3. (noun) geisha\n4. (noun) wheelbarrow',
+    })
+
+    assert fields['Meaning'] == '1. (noun) cat, 2. (noun) shamisen, 3. (noun) geisha'
+
+
+def test_meaning_field_keeps_short_lists_whole(anki):
+    fields = sent_fields(anki, {'word': '猫', 'meanings': '1. (noun) cat'})
+
+    assert fields['Meaning'] == '1. (noun) cat'
+
+
+def test_missing_meanings_readings_and_examples_leave_fields_empty(anki):
+    fields = sent_fields(anki, {'word': '猫'})
+
+    assert fields == {
+        'Expression': '猫',
+        'Reading': '',
+        'Meaning': '',
+        'Sentence': '',
+        'Sentence translation': '',
+    }
+
+
+def test_readings_and_first_example_fill_their_fields(anki):
+    fields = sent_fields(anki, {
+        'word': '猫',
+        'readings': ['ねこ', 'ネコ'],
+        'examples': [
+            {'japanese_text': '猫', 'sentences': {'japanese': '猫が好きです。', 'english': 'I like cats.'}},
+            {'japanese_text': '猫', 'sentences': {'japanese': '猫がいる。', 'english': 'There is a cat.'}},
+        ],
+    })
+
+    assert fields['Reading'] == 'ねこ, ネコ'
+    assert fields['Sentence'] == '猫が好きです。'
+    assert fields['Sentence translation'] == 'I like cats.'
@@ -0,0 +1,72 @@
+"""Tests for the command-line word list handling and CardUploader"""
+
+from dataclasses import dataclass
+
+from yasashii.cli import CardUploader, unique_words
+
+
+@dataclass
+class LookedUpWord:
+    """Stands in for a JapaneseWord whose meaning has been looked up"""
+
+    word: str
+    meaning: dict | None
+
+
+def found(word):
+    return LookedUpWord(word, {'word': word, 'meanings': f"1. {word}"})
+
+
+def test_unique_words_drops_empty_and_repeated_words_in_order():
+    assert unique_words(['猫', '', '犬', '猫', '鹿', '犬', '']) == ['猫', '犬', '鹿']
+
+
+def test_unique_words_accepts_any_iterable():
+    assert unique_words(line.strip() for line in ['猫\n', '\n', '猫\n']) == ['猫']
+
+
+def test_uploader_sends_cards_in_batches(anki):
+    uploader = CardUploader(batch_size=2)
+    for word in ['猫', '犬', '鹿', '蛇', '馬']:
+        uploader.submit(found(word))
+    uploader.finish()
+
+    assert anki.batch_sizes == [2, 2, 1]
+    assert anki.added == ['猫', '犬', '鹿', '蛇', '馬']
+
+
+def test_uploader_skips_words_not_found_or_already_queued(anki):
+    uploader = CardUploader(batch_size=2)
+    uploader.submit(found('猫'))
+    uploader.submit(found('猫'))
+    uploader.submit(LookedUpWord('ぬ', None))
+    uploader.finish()
+
+    assert anki.added == ['猫']
+
+
+def test_failed_request_is_reported_for_every_card_in_its_batch(anki, capsys):
+    """When a whole multi request fails, each of its cards is logged as failed"""
+    anki.multi_error = 'collection is not available'
+    uploader = CardUploader(batch_size=2)
+    for word in ['猫', '犬', '鹿']:
+        uploader.submit(found(word))
+    uploader.finish()
+
+    output = capsys.readouterr().out
+    for word in ['猫', '犬', '鹿']:
+        assert f"Failed to create card for '{word}'" in output
+    assert 'Successfully' not in output
+
+
+def test_each_card_in_a_batch_gets_its_own_outcome(anki, capsys):
+    """Anki's per-note results are matched back to the words of the batch"""
+    anki.notes = {1: '犬'}
+    uploader = CardUploader(batch_size=2)
+    for word in ['猫', '犬']:
+        uploader.submit(found(word))
+    uploader.finish()
+
+    output = capsys.readouterr().out
+    assert "Successfully created Anki card for: 猫" in output
+    assert "Card for '犬' already exists in deck" in output
@@ -0,0 +1,130 @@
+"""Tests for AnkiClient's persistent cache of previously added words"""
+
+import os
+
+import orjson
+import pytest
+
+from yasashii.anki_client import AnkiClient, SKIPPED_PREVIOUSLY_ADDED
+
+
+@pytest.fixture
+def known_words_path(anki):
+    return os.environ['AUTO_ANKI_KNOWN_WORDS_PATH']
+
+
+def write_known_words(path, known_words):
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(known_words))
+
+
+def read_known_words(path):
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def test_responses_line_up_with_cards_when_some_are_skipped(anki, known_words_path):
+    """Skipped cards keep their place among Anki's responses for the cards that were sent"""
+    anki.notes = {7: '犬'}
+    write_known_words(known_words_path, {'日本語': {'auto-anki': {'犬': 7}}})
+
+    with AnkiClient() as client:
+        responses = client.create_cards([{'word': '猫'}, {'word': '犬'}, {'word': '鹿'}])
+
+    assert anki.added == ['猫', '鹿']
+    assert responses == [
+        {"result": 100, "error": None},
+        {"result": 7, "error": None, "skipped": SKIPPED_PREVIOUSLY_ADDED},
+        {"result": 101, "error": None},
+    ]
+    assert read_known_words(known_words_path) == {'日本語': {'auto-anki': {'犬': 7, '猫': 100, '鹿': 101}}}
+
+
+def test_second_run_sends_nothing(anki, known_words_path):
+    """Words added by an earlier client are skipped without another addNote request"""
+    with AnkiClient() as client:
+        client.create_cards([{'word': '猫'}])
+    with AnkiClient() as client:
+        response = client.create_cards([{'word': '猫'}])[0]
+
+    assert anki.added == ['猫']
+    assert response == {"result": 100, "error": None, "skipped": SKIPPED_PREVIOUSLY_ADDED}
+
+
+def test_rejected_cards_are_not_remembered(anki, known_words_path):
+    """Only notes Anki actually created are remembered"""
+    anki.notes = {1: '猫'}
+
+    with AnkiClient() as client:
+        response = client.create_cards([{'word': '猫'}])[0]
+
+    assert response['error'] is not None
+    assert not os.path.exists(known_words_path)
+
+
+def test_save_keeps_other_decks_and_note_types(anki, known_words_path):
+    """Saving only replaces this client's deck and note type in the file"""
+    anki.notes = {1: '猫'}
+    write_known_words(known_words_path, {
+        '日本語': {'auto-anki': {'猫': 1}, 'other-type': {'犬': 2}},
+        'Other deck': {'auto-anki': {'鹿': 3}},
+    })
+
+    with AnkiClient() as client:
+        client.create_cards([{'word': '蛇'}])
+
+    assert read_known_words(known_words_path) == {
+        '日本語': {'auto-anki': {'猫': 1, '蛇': 100}, 'other-type': {'犬': 2}},
+        'Other deck': {'auto-anki': {'鹿': 3}},
+    }
+
+
+def test_words_whose_note_was_deleted_are_created_again(anki, known_words_path):
+    """Words whose note is no longer in Anki are forgotten, so their cards get created again"""
+    anki.notes = {1: '猫'}
+    write_known_words(known_words_path, {'日本語': {'auto-anki': {'猫': 1, '犬': 2}}})
+
+    with AnkiClient() as client:
+        responses = client.create_cards([{'word': '猫'}, {'word': '犬'}])
+
+    assert anki.added == ['犬']
+    assert responses[0]['skipped'] == SKIPPED_PREVIOUSLY_ADDED
+    assert read_known_words(known_words_path) == {'日本語': {'auto-anki': {'猫': 1, '犬': 100}}}
+
+
+def test_words_of_another_note_type_are_sent(anki, known_words_path):
+    """Words added under another note type aren't treated as known"""
+    write_known_words(known_words_path, {'日本語': {'other-type': {'猫': 1}}})
+
+    with AnkiClient() as client:
+        client.create_cards([{'word': '猫'}])
+
+    assert anki.added == ['猫']
+    assert 'findNotes' not in anki.actions
+
+
+@pytest.mark.parametrize('contents', [None, b'{not json', b'[1, 2]', b'{"\xe6\x97\xa5\xe6\x9c\xac\xe8\xaa\x9e": ["old format"]}'])
+def test_missing_or_corrupt_file_loads_as_empty(anki, known_words_path, contents):
+    """An unreadable or unexpected known words file starts an empty cache instead of failing"""
+    if contents is not None:
+        with open(known_words_path, 'wb') as f:
+            f.write(contents)
+
+    with AnkiClient() as client:
+        client.create_cards([{'word': '猫'}])
+
+    assert anki.added == ['猫']
+    assert 'findNotes' not in anki.actions
+    assert read_known_words(known_words_path) == {'日本語': {'auto-anki': {'猫': 100}}}
+
+
+def test_setup_is_checked_once_even_when_it_fails(anki, known_words_path):
+    """A missing deck fails every call, but Anki is only asked about it once"""
+    anki.decks = ['Other deck']
+
+    with AnkiClient() as client:
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Deck '日本語' does not exist"):
+                client.create_cards([{'word': '猫'}])
+
+    assert anki.actions == ['modelFieldNames', 'deckNames']
@@ -0,0 +1,66 @@
+"""Tests for ranking in the dictionary's surface index"""
+
+import orjson
+import pytest
+
+from yasashii.japanese_word import _build_index
+
+
+def raw_entry(entry_id, kanji=(), kana=(), gloss='meaning'):
+    """Build a JMdict JSON entry; spellings are (text, common) pairs"""
+    return {
+        'id': str(entry_id),
+        'kanji': [{'text': text, 'common': common} for text, common in kanji],
+        'kana': [{'text': text, 'common': common} for text, common in kana],
+        'sense': [{'partOfSpeech': [], 'gloss': [{'text': gloss}]}],
+    }
+
+
+@pytest.fixture
+def build(tmp_path):
+    def build(*entries):
+        path = tmp_path / 'jmdict.json'
+        path.write_bytes(orjson.dumps({'words': list(entries)}))
+        return _build_index(path)
+    return build
+
+
+def glosses(index, spelling):
+    return [entry.meanings for entry in index[spelling]]
+
+
+def test_kanji_spelling_matches_rank_before_kana_matches(build):
+    """An entry spelled with the word in kanji wins even over a common entry matched by kana"""
+    index = build(
+        raw_entry(1000, kana=[('かき', True)], gloss='common kana match'),
+        raw_entry(2000, kanji=[('かき', False)], kana=[('カキ', False)], gloss='rare kanji match'),
+    )
+
+    assert glosses(index, 'かき') == ['1. rare kanji match', '1. common kana match']
+
+
+def test_common_entries_rank_first_within_a_match_type(build):
+    index = build(
+        raw_entry(1000, kanji=[('柿', False)], kana=[('かき', False)], gloss='rare'),
+        raw_entry(2000, kanji=[('柿', True)], kana=[('かき', False)], gloss='common kanji'),
+        raw_entry(3000, kanji=[('柿', False)], kana=[('かき', True)], gloss='common kana'),
+    )
+
+    assert glosses(index, '柿') == ['1. common kanji', '1. common kana', '1. rare']
+    assert glosses(index, 'かき') == ['1. common kanji', '1. common kana', '1. rare']
+
+
+def test_lower_ids_rank_first_when_equally_common(build):
+    index = build(
+        raw_entry(2000, kana=[('かき', True)], gloss='later'),
+        raw_entry(1000, kana=[('かき', True)], gloss='earlier'),
+    )
+
+    assert glosses(index, 'かき') == ['1. earlier', '1. later']
+
+
+def test_entries_without_senses_are_left_out(build):
+    entry = raw_entry(1000, kana=[('かき', True)])
+    entry['sense'] = []
+
+    assert 'かき' not in build(entry)
@@ -1,10 +1,10 @@
 """Yasashii Anki - Japanese Dictionary Lookup Tool for Anki Card Creation"""
 
-from .logging import ColorfulLogger, logger
+from .logging import ColorfulLogger, console, logger
 from .japanese_word import JapaneseWord
 from .anki_client import AnkiClient
 
 __version__ = "1.0.0"
 __author__ = "Yasashii Anki"
 
-__all__ = ["ColorfulLogger", "logger", "JapaneseWord", "AnkiClient"]
+__all__ = ["ColorfulLogger", "console", "logger", "JapaneseWord", "AnkiClient"]
@@ -2,28 +2,121 @@
 
 import os
 import json
+import threading
+from itertools import islice
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from .logging import logger
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Default Anki Connect address, used when ANKI_URL isn't set. The explicit
+# 127.0.0.1 avoids slow 'localhost' name resolution on Windows.
+ANKI_URL = 'http://127.0.0.1:8765'
+
+# Maximum number of notes sent to Anki Connect in a single request
+MAX_BATCH_SIZE = 200
+
+# Maximum number of cards requested per cardsInfo call
+CARD_INFO_CHUNK_SIZE = 200
+
+# Request bodies are serialized with orjson, so the content type is set by hand
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Keys of AnkiClient._fields that are written on every note
+NOTE_FIELDS = ('word', 'reading', 'meaning', 'sentence', 'sentence_translation')
+
+# Words this client added to Anki are remembered here between runs, per deck
+# and note type, along with their note IDs. Importing the same list again then
+# skips them without sending notes Anki would only reject as duplicates.
+KNOWN_WORDS_PATH = os.path.join('~', '.cache', 'yasashii', 'known_words.json')
+
+# Reason given for cards skipped because their word was previously added
+SKIPPED_PREVIOUSLY_ADDED = 'skipped: previously added'
+
 
 class AnkiClient:
     """Client for connecting to the Anki Connect API"""
     
     def __init__(self):
-        self.api_url = os.getenv('ANKI_URL')
+        self.api_url = os.getenv('ANKI_URL', ANKI_URL)
         self.deck_name = os.getenv('AUTO_ANKI_DECK_NAME')
+
+        # Note type and field names don't change during a run, so read them once
+        self._card_type = os.getenv('AUTO_ANKI_CARD_TYPE')
+        self._fields = {
+            'word': os.getenv('AUTO_ANKI_WORD_FIELD'),
+            'reading': os.getenv('AUTO_ANKI_READING_FIELD'),
+            'meaning': os.getenv('AUTO_ANKI_MEANING_FIELD'),
+            'sentence': os.getenv('AUTO_ANKI_SENTENCE_FIELD'),
+            'sentence_translation': os.getenv('AUTO_ANKI_SENTENCE_TRANSLATION_FIELD'),
+            'audio': os.getenv('AUTO_ANKI_AUDIO_FIELD'),
+        }
+        # Everything but the fields is identical for every note, so build it once.
+        # Notes share these nested dicts; they are only ever serialized, never modified.
+        self._note_template = {
+            "deckName": self.deck_name,
+            "modelName": self._card_type,
+            "options": {
+                "allowDuplicate": False,
+                "duplicateScope": "deck",
+                "duplicateScopeOptions": {
+                    "deckName": self.deck_name,
+                    "checkChildren": False,
+                    "checkAllModels": False
+                }
+            },
+            "tags": [
+                "auto-anki"
+            ]
+            # "audio": {
+            #     "url": "https://assets.languagepod101.com/dictionary/japanese/audiomp3.php?kanji=猫&kana=ねこ",
+            #     "filename": "yomichan_ねこ_猫.mp3",
+            #     "skipHash": "7e2c2f954ef6051373ba916f000168dc",
+            # "fields": [
+            #     self._fields['audio']
+            # ]
+            # }
+        }
+
+        # Reuse one keep-alive connection to Anki Connect across requests
+        self._session = requests.Session()
+        self._session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=32))
+
+        # Note type and deck are only checked against Anki once per client
+        self._ready = False
+        self._ready_error = None
+        self._ready_lock = threading.Lock()
+        self._model_fields = set()
+        self._decks = set()
+
+        # Word -> note ID, loaded along with the readiness check, see _load_known_words()
+        self._known_words_path = os.path.expanduser(os.getenv('AUTO_ANKI_KNOWN_WORDS_PATH', KNOWN_WORDS_PATH))
+        self._known_words = {}
+        self._known_words_changed = False
     
+    def close(self):
+        """Save the known words and close the underlying HTTP session and its pooled connections"""
+        self._save_known_words()
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def post(self, payload):
         try:
             # Make POST request to Anki Connect API
-            response = requests.post(self.api_url, json=payload, timeout=10)
+            response = self._session.post(self.api_url, data=orjson.dumps(payload), headers=JSON_HEADERS, timeout=10)
             response.raise_for_status()  # Raise exception for HTTP errors
             
             # Parse JSON response
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Check if API returned an error
             if data.get('error') is not None:
@@ -64,12 +157,13 @@ class AnkiClient:
         }
         return self.post(payload)
 
-    def get_card_info(self, card_ids):
+    def get_card_info(self, card_ids, chunk_size=CARD_INFO_CHUNK_SIZE):
         """
         Get card information from a specific deck
         
         Args:
             card_ids (list): List of card IDs
+            chunk_size (int, optional): Maximum number of cards requested per API call
             
         Returns:
             list: List of card information
@@ -77,72 +171,238 @@ class AnkiClient:
         if not isinstance(card_ids, list):
             card_ids = [card_ids]
 
-        payload = {
-                "action": "cardsInfo",
-                "version": 6,
-                "params": {
-                    "cards": card_ids
-                }
-        }
+        card_info = []
+        # Large decks return megabytes of HTML, so keep each response bounded
+        for start in range(0, len(card_ids), chunk_size):
+            card_info.extend(self.post({
+                    "action": "cardsInfo",
+                    "version": 6,
+                    "params": {
+                        "cards": card_ids[start:start + chunk_size]
+                    }
+            }))
         
-        return self.post(payload)
+        return card_info
 
-    def create_card(self, card_info):
+    def _ensure_ready(self):
+        """Check once that the configured note type and deck exist in Anki, re-raising a failed check"""
+        # Cards may be created from several threads at once
+        with self._ready_lock:
+            if self._ready_error is not None:
+                raise self._ready_error
+            if self._ready:
+                return
+            try:
+                model_fields = self.post({
+                    "action": "modelFieldNames",
+                    "version": 6,
+                    "params": {"modelName": self._card_type}
+                })
+                decks = self.post({"action": "deckNames", "version": 6})
+                self._check_setup(model_fields, decks)
+                self._load_known_words()
+            except Exception as e:
+                # Every later batch would fail the same way, so don't ask Anki again
+                self._ready_error = e
+                raise
+            self._ready = True
+
+    def _check_setup(self, model_fields, decks):
         """
-        Create a new card in the Anki deck
+        Cache Anki's model fields and decks and validate the configuration against them
+        
+        Raises:
+            ValueError: If a configured field or the deck doesn't exist in Anki
+        """
+        self._model_fields = set(model_fields)
+        self._decks = set(decks)
+
+        missing_fields = [
+            self._fields[key] for key in NOTE_FIELDS
+            if self._fields[key] not in self._model_fields
+        ]
+        if missing_fields:
+            raise ValueError(
+                f"Note type '{self._card_type}' has no field(s): {', '.join(map(str, missing_fields))}"
+            )
+        if self.deck_name not in self._decks:
+            raise ValueError(f"Deck '{self.deck_name}' does not exist in Anki")
+
+    def _read_known_words_file(self):
+        """Return the known words file's {deck: {note type: {word: note ID}}} contents, or {} if it can't be read"""
+        try:
+            with open(self._known_words_path, 'rb') as f:
+                known_words = orjson.loads(f.read())
+            return known_words if isinstance(known_words, dict) else {}
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+
+    def _load_known_words(self):
+        """
+        Load the words previously added to this client's deck and note type
+        
+        Words whose note no longer exists in Anki (e.g. it was deleted) are
+        dropped, so their cards get created again.
+        """
+        by_note_type = self._read_known_words_file().get(self.deck_name)
+        known_words = by_note_type.get(self._card_type) if isinstance(by_note_type, dict) else None
+        if not isinstance(known_words, dict):
+            known_words = {}
+        self._known_words_changed = False
+
+        if known_words:
+            # One findNotes call checks every remembered note against Anki
+            note_ids = set(self.post({
+                "action": "findNotes",
+                "version": 6,
+                "params": {"query": f'"deck:{self.deck_name}" "note:{self._card_type}"'}
+            }))
+            live_words = {word: note_id for word, note_id in known_words.items() if note_id in note_ids}
+            self._known_words_changed = len(live_words) < len(known_words)
+            known_words = live_words
+        self._known_words = known_words
+
+    def _save_known_words(self):
+        """Write this deck and note type's known words back to the known words file, if they changed"""
+        if not self._known_words_changed:
+            return
+        # Other decks' and note types' words are kept as they are in the file
+        known_words = self._read_known_words_file()
+        by_note_type = known_words.get(self.deck_name)
+        if not isinstance(by_note_type, dict):
+            by_note_type = known_words[self.deck_name] = {}
+        by_note_type[self._card_type] = dict(sorted(self._known_words.items()))
+        try:
+            os.makedirs(os.path.dirname(self._known_words_path), exist_ok=True)
+            # Write to a temporary file and swap it in, so an interrupted save
+            # never leaves a half-written file behind
+            temp_path = f"{self._known_words_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(orjson.dumps(known_words))
+            os.replace(temp_path, self._known_words_path)
+            self._known_words_changed = False
+        except OSError as e:
+            logger.warning(f"Could not save known words to {self._known_words_path}: {e}")
+
+    def _build_note(self, card_info):
+        """
+        Build the Anki Connect note dictionary for a single card
         
         Args:
             card_info (dict): Dictionary containing card information
+            
+        Returns:
+            dict: Note in the format expected by addNote
         """
-        card_type=os.getenv('AUTO_ANKI_CARD_TYPE')
-        word_field=os.getenv('AUTO_ANKI_WORD_FIELD')
-        reading_field=os.getenv('AUTO_ANKI_READING_FIELD')
-        meaning_field=os.getenv('AUTO_ANKI_MEANING_FIELD')
-        sentence_field=os.getenv('AUTO_ANKI_SENTENCE_FIELD')
-        sentence_translation_field=os.getenv('AUTO_ANKI_SENTENCE_TRANSLATION_FIELD')
-        audio_field=os.getenv('AUTO_ANKI_AUDIO_FIELD')
+        fields = self._fields
+        readings = card_info.get('readings')
+        # Meanings arrive preformatted as a numbered list, one meaning per line
+        meanings = card_info.get('meanings')
 
+        sentence = sentence_translation = None
         if card_info.get('examples'):
             example = card_info['examples'][0]
             sentence = example['sentences']['japanese']
             sentence_translation = example['sentences']['english']
 
-        payload = {
-            "action": "addNote",
-            "version": 6,
-            "params": {
-                "note": {
-                    "deckName": self.deck_name,
-                    "modelName": card_type,
-                    "fields": {
-                        word_field: card_info.get('word'),
-                        reading_field: ', '.join(card_info.get('readings', [])),
-                        meaning_field: ', '.join(card_info.get('meanings', [])[:3]),
-                        sentence_field: sentence if sentence else '',
-                        sentence_translation_field: sentence_translation if sentence_translation else '',
-                    },
-                    "options": {
-                        "allowDuplicate": False,
-                        "duplicateScope": "deck",
-                        "duplicateScopeOptions": {
-                            "deckName": self.deck_name,
-                            "checkChildren": False,
-                            "checkAllModels": False
-                        }
-                    },
-                    "tags": [
-                        "auto-anki"
-                    ]
-                    # "audio": {
-                    #     "url": "https://assets.languagepod101.com/dictionary/japanese/audiomp3.php?kanji=猫&kana=ねこ",
-                    #     "filename": "yomichan_ねこ_猫.mp3",
-                    #     "skipHash": "7e2c2f954ef6051373ba916f000168dc",
-                    # "fields": [
-                    #     audio_field
-                    # ]
-                    # }
+        return {
+            **self._note_template,
+            "fields": {
+                fields['word']: card_info.get('word'),
+                fields['reading']: ', '.join(readings) if readings else '',
+                fields['meaning']: ', '.join(islice(meanings.splitlines(), 3)) if meanings else '',
+                fields['sentence']: sentence if sentence else '',
+                fields['sentence_translation']: sentence_translation if sentence_translation else '',
+            },
+        }
+
+    def create_cards(self, card_infos):
+        """
+        Create several cards in the Anki deck, batching them into multi requests
+        
+        Args:
+            card_infos (list): List of card information dictionaries
+            
+        Returns:
+            list: One {"result": note_id, "error": message} dictionary per card,
+                  in the same order as card_infos. Cards whose word this client
+                  previously added aren't sent; their dictionary holds the
+                  existing note ID and "skipped": SKIPPED_PREVIOUSLY_ADDED.
+        """
+        self._ensure_ready()
+        skipped, new_cards = self._skip_known_cards(card_infos)
+        responses = []
+        # Keep each request bounded so huge imports don't overwhelm Anki Connect
+        for start in range(0, len(new_cards), MAX_BATCH_SIZE):
+            actions = [
+                {
+                    "action": "addNote",
+                    "version": 6,
+                    "params": {"note": self._build_note(card_info)}
                 }
+                for card_info in new_cards[start:start + MAX_BATCH_SIZE]
+            ]
+            payload = {
+                "action": "multi",
+                "version": 6,
+                "params": {"actions": actions}
             }
-        }
+            responses.extend(self.post(payload))
         
-        return self.post(payload)
+        return self._merge_responses(card_infos, skipped, new_cards, responses)
+
+    def _skip_known_cards(self, card_infos):
+        """
+        Split off the cards whose word this client previously added to the deck
+        
+        Returns:
+            tuple: (skipped, new_cards), where skipped holds one bool per card
+                   in card_infos and new_cards the cards that still need sending
+        """
+        skipped = [card_info.get('word') in self._known_words for card_info in card_infos]
+        new_cards = [card_info for card_info, skip in zip(card_infos, skipped) if not skip]
+        return skipped, new_cards
+
+    def _merge_responses(self, card_infos, skipped, new_cards, responses):
+        """Remember the words Anki just added and line up responses with the original cards"""
+        for card_info, response in zip(new_cards, responses):
+            # Only notes created here are remembered: their IDs let the next run
+            # check they still exist, which a duplicate error can't offer
+            if response.get('error') is None and response.get('result') is not None:
+                self._known_words[card_info.get('word')] = response['result']
+                self._known_words_changed = True
+
+        merged = []
+        responses = iter(responses)
+        for card_info, skip in zip(card_infos, skipped):
+            if skip:
+                merged.append({
+                    "result": self._known_words[card_info.get('word')],
+                    "error": None,
+                    "skipped": SKIPPED_PREVIOUSLY_ADDED,
+                })
+            else:
+                merged.append(next(responses))
+        return merged
+
+    def create_card(self, card_info):
+        """
+        Create a new card in the Anki deck
+        
+        Args:
+            card_info (dict): Dictionary containing card information
+            
+        Returns:
+            int: ID of the created note
+            
+        Raises:
+            ValueError: If Anki rejects the note (e.g. it is a duplicate) or it
+                was skipped because its word was previously added
+        """
+        response = self.create_cards([card_info])[0]
+        if response.get('skipped'):
+            raise ValueError(f"Note {response['result']} was not created again: {response['skipped']}")
+        if response.get('error') is not None:
+            raise ValueError(f"Anki API error: {response['error']}")
+        
+        return response.get('result')
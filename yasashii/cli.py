@@ -0,0 +1,220 @@
+"""
+Yasashii Anki - Word processing for the command line
+
+Looks words up, displays them and uploads them to Anki. Kept apart from the
+entry point so it can be imported without parsing command-line arguments.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .logging import console, logger
+from .japanese_word import JapaneseWord
+from .anki_client import AnkiClient
+
+# Maximum number of upload requests in flight at once. Anki Connect handles
+# requests one at a time, so more workers than this only queue up inside Anki.
+MAX_CONCURRENT_UPLOADS = 8
+
+# Maximum number of upload requests queued or in flight before lookups
+# wait for the oldest to finish, letting Anki Connect catch up
+MAX_QUEUED_UPLOADS = 32
+
+# Number of cards sent to Anki Connect per request
+UPLOAD_BATCH_SIZE = 32
+
+
+class CardUploader:
+    """Uploads Anki cards in batches in the background while the remaining words are still being looked up"""
+
+    def __init__(self, batch_size=UPLOAD_BATCH_SIZE):
+        """
+        Args:
+            batch_size (int, optional): Cards per request. With 1, every card gets its
+                own request and per-card requests run in parallel on the worker pool.
+        """
+        self.batch_size = batch_size
+        self.client = AnkiClient()
+        self.executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_UPLOADS)
+        self.uploads = deque()
+        self.pending = []
+        self.queued_words = set()
+
+    def submit(self, word):
+        """Queue a card for the word, if it was found in the dictionary, sending full batches right away"""
+        # A word already queued would only come back from Anki as a duplicate
+        if not word.meaning or word.word in self.queued_words:
+            return
+        self.queued_words.add(word.word)
+        self.pending.append(word)
+        if len(self.pending) >= self.batch_size:
+            self._send_pending()
+
+    def _send_pending(self):
+        if self.pending:
+            batch, self.pending = self.pending, []
+            # Wait for the oldest request once too many are queued, so a long
+            # word list can't pile up unbounded work (and memory) ahead of Anki
+            while len(self.uploads) >= MAX_QUEUED_UPLOADS:
+                self._report(*self.uploads.popleft())
+            self.uploads.append((batch, self.executor.submit(self.client.create_cards, [word.meaning for word in batch])))
+            # Log requests that have already finished and let go of their cards
+            while self.uploads and self.uploads[0][1].done():
+                self._report(*self.uploads.popleft())
+
+    def _report(self, batch, upload):
+        """Wait for an upload request to complete and log the outcome of each card in it"""
+        try:
+            responses = upload.result()
+        except Exception as e:
+            # The whole request failed, so every card in the batch did
+            responses = [{"result": None, "error": str(e)}] * len(batch)
+        for word, response in zip(batch, responses):
+            error = response.get('error')
+            if response.get('skipped'):
+                logger.info(f"Card for '{word.word}' {response['skipped']}", "⏭️")
+            elif error is None:
+                logger.success(f"Successfully created Anki card for: {word.word}", "🎴")
+            elif "duplicate" in str(error).lower():
+                logger.warning(f"Card for '{word.word}' already exists in deck", "🔄")
+            else:
+                logger.error(f"Failed to create card for '{word.word}': {error}", "❌")
+
+    def finish(self):
+        """Send any remaining cards, wait for every upload to complete and log the outcome of each card"""
+        self._send_pending()
+        try:
+            while self.uploads:
+                self._report(*self.uploads.popleft())
+            logger.info(f"Sent cards for {len(self.queued_words)} words to Anki", "📝")
+        finally:
+            self.executor.shutdown()
+            self.client.close()
+
+
+def lookup_words(words, uploader=None):
+    """
+    Look up and display each word under a progress bar, handing found words to the uploader if given
+    
+    Each word is displayed as soon as it is looked up, so output starts right
+    away and the looked-up words aren't collected into a list. When creating
+    cards, the uploader still holds the words of its unsent and unfinished
+    batches, and the spelling of every word it has queued.
+    """
+    from rich.progress import BarColumn, Progress, SpinnerColumn, TaskProgressColumn, TextColumn
+
+    # Each displayed word redraws the bar anyway, so the background refresh only
+    # needs to keep the spinner moving. Advancing per word is cheap and keeps the
+    # count exact, since it just updates the task.
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[bold blue]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        console=console,
+        refresh_per_second=4,
+        transient=True,
+        # Nothing to animate when output is redirected to a file or pipe
+        disable=not console.is_terminal,
+    )
+    with progress:
+        task = progress.add_task("🔍 Looking up words...", total=len(words))
+        for word_text in words:
+            word = JapaneseWord(word_text)
+            # Printing through the shared console keeps the bar below the output
+            word.display()
+            console.print()  # Add spacing between words
+            if uploader:
+                uploader.submit(word)
+            progress.advance(task)
+
+
+def unique_words(words):
+    """Drop empty and repeated words, keeping the first occurrence, so each is looked up and uploaded once"""
+    words = [word for word in words if word]
+    unique = list(dict.fromkeys(words))
+    if len(unique) < len(words):
+        logger.info(f"Skipping {len(words) - len(unique)} duplicate words", "♻️")
+    return unique
+
+
+def new_uploader(create, batch):
+    """Return a CardUploader when cards should be created, otherwise None"""
+    if not create:
+        return None
+    return CardUploader(UPLOAD_BATCH_SIZE if batch else 1)
+
+
+def process_single_word(word_text, create=False, batch=True):
+    """Process and display a single Japanese word"""
+    try:
+        logger.info(f"Looking up word: {word_text}", "🔍")
+        
+        word = JapaneseWord(word_text)
+        
+        if word.meaning:
+            uploader = new_uploader(create, batch)
+            try:
+                if uploader:
+                    uploader.submit(word)
+                word.display()
+            finally:
+                if uploader:
+                    uploader.finish()
+        else:
+            logger.warning(f"No translation found for: {word_text}", "❓")
+            logger.info("Try checking the spelling or using a different form of the word", "💡")
+    
+
+    except Exception as e:
+        logger.error(f"Error processing word '{word_text}': {e}")
+
+
+def process_words_from_file(file_path, create=False, batch=True):
+    """Read words from a text file and display their meanings"""
+    try:
+        logger.info(f"Reading words from file: {file_path}", "📖")
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            words = unique_words(line.strip() for line in f)
+        
+        logger.success(f"Found {len(words)} words to process", "🎯")
+        logger.header(f"Processing Words from {file_path}", "📂")
+        
+        # Uploads start as soon as each word is found, overlapping the remaining lookups
+        uploader = new_uploader(create, batch)
+        
+        try:
+            # Look up and display words with progress bar
+            lookup_words(words, uploader)
+        finally:
+            # Even if a lookup fails or the run is cancelled, report the uploads
+            # already sent and save what Anki accepted
+            if uploader:
+                uploader.finish()
+        
+        logger.success(f"Completed processing {len(words)} words!", "🎉")
+                
+    except FileNotFoundError:
+        logger.error(f"File '{file_path}' not found.")
+    except Exception as e:
+        logger.error(f"Error processing file: {e}")
+
+def process_multiple_words(words, create=False, batch=True):
+    """Process multiple Japanese words"""
+    words = unique_words(words)
+    logger.success(f"{len(words)} words to process", "🎯")
+    
+    # Uploads start as soon as each word is found, overlapping the remaining lookups
+    uploader = new_uploader(create, batch)
+    
+    try:
+        # Look up and display words with progress bar
+        lookup_words(words, uploader)
+    finally:
+        # Even if a lookup fails or the run is cancelled, report the uploads
+        # already sent and save what Anki accepted
+        if uploader:
+            uploader.finish()
+    
+    logger.success(f"Completed processing {len(words)} words!", "🎉")
@@ -1,133 +1,282 @@
 """Japanese word lookup and processing module"""
 
-import json
-import jmespath
+import functools
+import gc
 import os
-from rich.progress import track
-from rich.console import Console
-from .logging import logger
+import pickle
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from operator import itemgetter
+import orjson
+from .logging import console, logger
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Set up Rich console
-console = Console()
+# Bump whenever the cached index layout changes so stale caches get rebuilt
+INDEX_VERSION = 9
 
-# Load the Japanese dictionary data
-dict_path = os.getenv('JMDICT_PATH')
-with open(dict_path, 'r') as f:
-    jmdict_words = json.load(f).get('words')
+# Number of common readings and kanji spellings shown per word
+MAX_COMMON_FORMS = 2
 
-class JapaneseWord(str):
-    """Extended string class for Japanese words with dictionary lookup capabilities"""
 
-    def __init__(self, word: str):
-        super().__init__()
-        self.word = word
-        self.meaning = self._get_primary_meaning()
+@dataclass(slots=True)
+class Entry:
+    """
+    A JMdict entry reduced to what lookups read
     
-    def _get_jp_word(self, word: str, prefer_common=True, max_senses=3):
-        """
-        Get Japanese word with options to filter results
-        
-        Args:
-            word: The word to search for
-            prefer_common: If True, prioritize common readings/kanji
-            max_senses: Maximum number of senses to return per word
-        """
-        # 1. Search in kanji.text
-        expr_kanji = jmespath.compile(f"[?kanji[?text=='{word}']]")
-        result = expr_kanji.search(jmdict_words)
-        if result:
-            return self._filter_and_rank_results(result, prefer_common, max_senses)
-
-        # 2. If not found, search in kana.text
-        expr_kana = jmespath.compile(f"[?kana[?text=='{word}']]")
-        result = expr_kana.search(jmdict_words)
-        if result:
-            return self._filter_and_rank_results(result, prefer_common, max_senses)
-
-        # 3. Nothing found
-        return None
+    Entries are built once when the index is built, so lookups only read
+    attributes instead of walking the raw JSON with .get() calls. Only the
+    primary (first) sense is kept, since that is the only one ever shown.
+    """
 
-    def _filter_and_rank_results(self, results, prefer_common=True, max_senses=3):
-        """Filter and rank results to get the best matches"""
-        if not results:
-            return None
-            
-        # Sort results by preference
-        if prefer_common:
-            # Prioritize entries with common kanji/kana
-            results.sort(key=lambda x: (
-                # First sort by whether it has common kanji
-                -any(k.get('common', False) for k in x.get('kanji', [])),
-                # Then by whether it has common kana
-                -any(k.get('common', False) for k in x.get('kana', [])),
-                # Finally by ID (earlier entries are often more common)
-                int(x.get('id', '999999'))
-            ))
-        
-        # Take the best result and limit senses
-        best_result = results[0].copy()
-        if max_senses and len(best_result.get('sense', [])) > max_senses:
-            best_result['sense'] = best_result['sense'][:max_senses]
-            
-        return best_result
+    common_kana: list[str]
+    common_kanji: list[str]
+    meanings: str  # Primary sense's numbered glosses ready for display, see _format_meanings()
+    examples: list[dict]  # Primary sense's Japanese/English sentence pairs, see _example_pairs()
+
+
+def _rank_key(entry):
+    """
+    Sort key preferring entries with common kanji, then common kana, then lower IDs
     
-    def _get_primary_meaning(self, max_examples=2):
-        """Get the primary meaning of this Japanese word"""
-        result = self._get_jp_word(self.word, prefer_common=True, max_senses=1)
-        if result and result.get('sense'):
-            primary_sense = result['sense'][0]
-            
-            # Extract example sentences
-            examples = []
-            for example in primary_sense.get('examples', [])[:max_examples]:
-                example_entry = {
-                    'japanese_text': example.get('text', ''),
-                    'sentences': []
+    The three criteria are packed into one integer (flags above the 32-bit
+    entry ID), so sorting the index buckets compares ints instead of tuples.
+    """
+    no_common_kanji = not any(k.get('common', False) for k in entry.get('kanji', []))
+    no_common_kana = not any(k.get('common', False) for k in entry.get('kana', []))
+    # Earlier entries are often more common
+    entry_id = int(entry.get('id', '999999'))
+    return (no_common_kanji << 33) | (no_common_kana << 32) | entry_id
+
+
+# Added to the rank key of entries matched by a kana spelling, so that entries
+# matched by a kanji spelling always rank first
+KANA_MATCH = 1 << 34
+
+
+def _example_pairs(examples):
+    """
+    Reduce raw JMdict examples to those with both a Japanese and an English sentence
+    
+    Returns:
+        list: Dictionaries in the form shown to the user and sent to Anki,
+              {'japanese_text', 'sentences': {'japanese', 'english'}}
+    """
+    pairs = []
+    for example in examples:
+        # Find the first Japanese and English sentences in one pass
+        japanese_sentence = english_sentence = None
+        for sentence in example.get('sentences', []):
+            language = sentence.get('land')
+            if language == 'jpn' and japanese_sentence is None:
+                japanese_sentence = sentence.get('text', '')
+            elif language == 'eng' and english_sentence is None:
+                english_sentence = sentence.get('text', '')
+            if japanese_sentence is not None and english_sentence is not None:
+                break
+
+        if japanese_sentence is not None and english_sentence is not None:
+            pairs.append({
+                'japanese_text': example.get('text', ''),
+                'sentences': {
+                    'japanese': japanese_sentence,
+                    'english': english_sentence
                 }
-                
-                for sentence in example.get('sentences', []):
-                    if sentence.get('land') == 'jpn':
-                        japanese_sentence = sentence.get('text', '')
-                    elif sentence.get('land') == 'eng':
-                        english_sentence = sentence.get('text', '')
-                
-                # Find matching Japanese and English pairs
-                jpn_sentences = [s.get('text', '') for s in example.get('sentences', []) if s.get('land') == 'jpn']
-                eng_sentences = [s.get('text', '') for s in example.get('sentences', []) if s.get('land') == 'eng']
-                
-                if jpn_sentences and eng_sentences:
-                    example_entry['sentences'] = {
-                        'japanese': jpn_sentences[0],
-                        'english': eng_sentences[0]
-                    }
-                    examples.append(example_entry)
-
-            meanings = [g['text'] for g in primary_sense.get('gloss', [])]
-            part_of_speech = primary_sense.get('partOfSpeech', [])
-            
-            # Format meanings as numbered list with part of speech in parentheses
-            formatted_meanings_list = []
-            for i, meaning in enumerate(meanings):
-                # Include part of speech with each meaning
-                pos_str = ', '.join(part_of_speech) if part_of_speech else ''
-                pos_prefix = f"({pos_str}) " if pos_str else ''
-                formatted_meanings_list.append(f"{i+1}. {pos_prefix}{meaning}")
-            
-            formatted_meanings = '\n'.join(formatted_meanings_list)
-            
-            return {
-                'word': self.word,
-                'readings': [k['text'] for k in result.get('kana', []) if k.get('common', False)][:2],
-                'kanji': [k['text'] for k in result.get('kanji', []) if k.get('common', False)][:2],
-                'meanings': formatted_meanings,
-                'examples': examples
-            }
+            })
+    return pairs
+
+
+def _format_meanings(glosses, part_of_speech):
+    """Format glosses as a numbered list, one per line, each prefixed with the part of speech in parentheses"""
+    pos_str = ', '.join(part_of_speech)
+    pos_prefix = f"({pos_str}) " if pos_str else ''
+    return '\n'.join(f"{i}. {pos_prefix}{gloss}" for i, gloss in enumerate(glosses, 1))
+
+
+def _slim_entry(entry):
+    """
+    Convert a raw JMdict entry into an Entry holding only what lookups read
+    
+    Returns:
+        Entry: The slim entry, or None if the entry has no senses
+    """
+    if not entry.get('sense'):
         return None
+    primary_sense = entry['sense'][0]
+    return Entry(
+        common_kana=[k['text'] for k in entry.get('kana', []) if k.get('common', False)][:MAX_COMMON_FORMS],
+        common_kanji=[k['text'] for k in entry.get('kanji', []) if k.get('common', False)][:MAX_COMMON_FORMS],
+        meanings=_format_meanings([g['text'] for g in primary_sense.get('gloss', [])], primary_sense.get('partOfSpeech', [])),
+        examples=_example_pairs(primary_sense.get('examples', [])),
+    )
+
+
+def _build_index(path):
+    """
+    Parse the JMdict JSON file and index it for lookups
+    
+    Returns:
+        dict: Maps every kanji and kana spelling to its Entry objects, best
+              first, so a lookup is a single dict access.
+    """
+    # orjson parses the ~125 MB file several times faster than the json module
+    with open(path, 'rb') as f:
+        raw_words = orjson.loads(f.read()).get('words')
+
+    surface_index = {}
+    for raw_entry in raw_words:
+        # Spellings repeat across entries (and between the index keys and the
+        # common forms); interning makes every copy one shared object, which
+        # pickle then stores only once
+        for form in (*raw_entry.get('kanji', []), *raw_entry.get('kana', [])):
+            form['text'] = sys.intern(form['text'])
+        entry = _slim_entry(raw_entry)
+        if entry is None:
+            continue  # Nothing to show for an entry without senses
+        rank_key = _rank_key(raw_entry)
+        for kanji in raw_entry.get('kanji', []):
+            surface_index.setdefault(kanji['text'], []).append((rank_key, entry))
+        # Entries spelled this way in kana rank after every kanji spelling match
+        for kana in raw_entry.get('kana', []):
+            surface_index.setdefault(kana['text'], []).append((KANA_MATCH | rank_key, entry))
+
+    # Rank every bucket once here, so a lookup just takes its first entry
+    for spelling, bucket in surface_index.items():
+        bucket.sort(key=itemgetter(0))
+        surface_index[spelling] = [entry for _, entry in bucket]
+
+    return surface_index
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Pause the cyclic garbage collector while building large object graphs
+    
+    Parsing or unpickling the dictionary allocates millions of objects, and
+    the collector would otherwise rescan them over and over as they pile up.
+    """
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def _load_dict(path):
+    """
+    Load the dictionary index, using a pickle cache next to the JSON file
+    
+    The cache is rebuilt whenever the JSON file is newer than it or it was
+    written by an older index layout.
     
+    Raises:
+        ValueError: If path is unset or isn't an existing file
+    """
+    if not path:
+        raise ValueError("JMDICT_PATH is not set, point it at the JMdict JSON file")
+    if not os.path.isfile(path):
+        raise ValueError(f"JMDICT_PATH '{path}' is not a file")
+
+    cache_path = f"{path}.pkl"
+    if os.path.exists(cache_path) and os.path.getmtime(path) <= os.path.getmtime(cache_path):
+        try:
+            with open(cache_path, 'rb') as f, _gc_paused():
+                # The version is pickled on its own ahead of the index, so an index
+                # written with an older Entry layout is never unpickled
+                if pickle.load(f) == INDEX_VERSION:
+                    return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError, IndexError, TypeError):
+            pass  # Unreadable or outdated cache, fall through and rebuild it
+
+    logger.info("Building dictionary index, this only happens once", "🏗️")
+    with _gc_paused():
+        index = _build_index(path)
+    try:
+        # Write to a temporary file and swap it in, so an interrupted run or a
+        # concurrent reader never sees a half-written cache
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(INDEX_VERSION, f, protocol=5)
+            pickle.dump(index, f, protocol=5)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache dictionary index at {cache_path}: {e}")
+    return index
+
+
+# Loaded dictionary data, see _get_jmdict()
+_JMDICT = None
+
+
+def _get_jmdict():
+    """
+    Return the surface index (see _build_index()), loading it on first use
+    
+    Loading is deferred so that importing this module (e.g. for --help) doesn't
+    pay for reading the dictionary.
+    """
+    global _JMDICT
+    if _JMDICT is None:
+        _JMDICT = _load_dict(os.getenv('JMDICT_PATH'))
+        # The dictionary lives for the whole run; move it out of the GC's reach so
+        # later collections (and interpreter shutdown) don't rescan millions of objects
+        gc.freeze()
+    return _JMDICT
+
+
+@functools.lru_cache(maxsize=8192)
+def _primary_meaning(word: str, max_examples=2):
+    """
+    Get the primary meaning of a Japanese word, preferring common readings/kanji
+    
+    Results are cached per word, so the returned dictionary is shared
+    between callers and must not be modified.
+    """
+    entries = _get_jmdict().get(word)
+    if not entries:
+        return None  # Nothing found
+
+    # Buckets are sorted best first, kanji spelling matches ahead of kana ones,
+    # when the index is built
+    result = entries[0]
+
+    # Meanings and example sentence pairs were prepared when the index was
+    # built, so a lookup only assembles them
+    return {
+        'word': word,
+        'readings': result.common_kana,
+        'kanji': result.common_kanji,
+        'meanings': result.meanings,
+        'examples': result.examples[:max_examples]
+    }
+
+
+# Marks a JapaneseWord whose meaning hasn't been looked up yet (None means "not found")
+_NOT_LOOKED_UP = object()
+
+
+@dataclass(frozen=True, slots=True)
+class JapaneseWord:
+    """Japanese word with dictionary lookup capabilities"""
+
+    word: str
+    _meaning: dict | None = field(default=_NOT_LOOKED_UP, init=False, repr=False, compare=False)
+
+    @property
+    def meaning(self):
+        """Primary meaning of the word, looked up on first access and then kept on the instance"""
+        if self._meaning is _NOT_LOOKED_UP:
+            # The dataclass is frozen so words stay hashable; this lazy cache is the one exception
+            object.__setattr__(self, '_meaning', self._get_primary_meaning())
+        return self._meaning
+    
+    def _get_primary_meaning(self, max_examples=2):
+        """Get the primary meaning of this Japanese word"""
+        return _primary_meaning(self.word, max_examples)
 
     def display(self):
         """Display the word using colorful logging (for explicit display calls)"""
@@ -137,43 +286,25 @@ class JapaneseWord(str):
             logger.word_result(self.meaning)
 
     def __str__(self):
-        """Return a formatted string representation of the word"""
-        if not self.meaning:
-            return f"JapaneseWord('{self.word}') - No translation found"
-            
-        readings = ', '.join(self.meaning.get('readings', []))
-        meanings = self.meaning.get('meanings', '')  # Already formatted as numbered list
-        if readings:
-            return f"{self.word} ({readings}) - {meanings}"
-        else:
-            return f"{self.word} - {meanings}"
-    
-    def __repr__(self):
-        """Return detailed representation for debugging"""
-        if not self.meaning:
-            return f"JapaneseWord('{self.word}', found=False)"
-            
-        readings = self.meaning.get('readings', [])
-        meanings = self.meaning.get('meanings', [])
-        examples = self.meaning.get('examples', [])
-        
-        return (f"JapaneseWord('{self.word}', found=True, "
-                f"readings={len(readings)}, meanings={len(meanings)}, "
-                f"examples={len(examples)})")
-    
+        """Return the word itself, so it can be used anywhere a plain string is expected"""
+        return self.word
+
     @staticmethod
     def format_multiple_words(words_list):
         """Format and display multiple words in a nice readable format"""
+        from rich.progress import track
+
         logger.header("Processing Multiple Words", "📚")
         
-        # Process words with progress bar
-        processed_words = []
-        for word_str in track(words_list, description="🔍 Looking up words..."):
-            word = JapaneseWord(word_str)
-            processed_words.append(word)
+        # Look each distinct word up once, while the progress bar is shown, keeping the original order
+        looked_up = {word_str: JapaneseWord(word_str) for word_str in dict.fromkeys(words_list)}
+        found = [word for word in track(looked_up.values(), description="🔍 Looking up words...", console=console,
+                                        refresh_per_second=4, transient=True, disable=not console.is_terminal)
+                 if word.meaning]
         
-        # Display results after progress is complete
+        # Display results after progress is complete, repeats included
         console.print()  # Add spacing after progress bar
-        for word in processed_words:
-            word.display()
+        for word_str in words_list:
+            looked_up[word_str].display()
             console.print()  # Add spacing between words
+        logger.success(f"Found {len(found)} of {len(looked_up)} words", "🎯")
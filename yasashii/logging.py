@@ -1,15 +1,17 @@
 """Colorful logging module with Rich library support and emojis"""
 
 from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
-from rich.table import Table
+
+# Shared console for all terminal output, so progress bars and log lines
+# go through one renderer
+console = Console()
+
 
 class ColorfulLogger:
     """Custom logger with rich colors and emojis"""
     
     def __init__(self):
-        self.console = Console()
+        self.console = console
     
     def info(self, message, emoji="ℹ️"):
         self.console.print(f"{emoji} [blue]{message}[/blue]")
@@ -24,6 +26,10 @@ class ColorfulLogger:
         self.console.print(f"{emoji} [red]{message}[/red]")
     
     def header(self, title, emoji="🌸"):
+        # Imported here so plain log lines don't pay for loading these
+        from rich.panel import Panel
+        from rich.text import Text
+
         panel = Panel(
             Text(title, style="bold magenta"), 
             border_style="magenta",
@@ -36,17 +42,22 @@ class ColorfulLogger:
         if not word_data:
             return
             
-        self.console.print(f"\n{emoji} [bold cyan]{word_data.get('word', 'Word')}[/bold cyan]")
-        self.console.print(f"[bold cyan]Word:\t\t[/bold cyan][bold yellow]{word_data.get('word', 'N/A')}[/bold yellow]")
-        self.console.print(f"[bold cyan]Reading:\t[/bold cyan][green]{', '.join(word_data.get('readings', []))}[/green]")
-        self.console.print(f"[bold cyan]Meaning:\t[/bold cyan][blue]{word_data.get('meanings', '')}[/blue]")
+        lines = [
+            f"\n{emoji} [bold cyan]{word_data.get('word', 'Word')}[/bold cyan]",
+            f"[bold cyan]Word:\t\t[/bold cyan][bold yellow]{word_data.get('word', 'N/A')}[/bold yellow]",
+            f"[bold cyan]Reading:\t[/bold cyan][green]{', '.join(word_data.get('readings', []))}[/green]",
+            f"[bold cyan]Meaning:\t[/bold cyan][blue]{word_data.get('meanings', '')}[/blue]",
+        ]
         
         if word_data.get('examples'):
             example = word_data['examples'][0]
-            self.console.print(f"[bold cyan]Example:\t[/bold cyan][dim white]{example['sentences']['japanese']}[/dim white]")
-            self.console.print(f"[bold cyan]Translation:\t[/bold cyan][dim cyan]{example['sentences']['english']}[/dim cyan]")
+            lines.append(f"[bold cyan]Example:\t[/bold cyan][dim white]{example['sentences']['japanese']}[/dim white]")
+            lines.append(f"[bold cyan]Translation:\t[/bold cyan][dim cyan]{example['sentences']['english']}[/dim cyan]")
         
-        self.console.print()
+        # Render the whole result in one print (ending in a blank line), since
+        # each print call parses markup and renders separately
+        lines.append('')
+        self.console.print('\n'.join(lines))
 
 
 # Create global logger instance